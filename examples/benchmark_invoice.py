@@ -0,0 +1,65 @@
+import time
+
+from pydantic import BaseModel
+
+from lztpay.core.models import Currency, InvoiceCreate
+from lztpay.decorators import validate_params
+
+ITERATIONS = 100_000
+
+INVOICE = {
+    "currency": Currency.RUB,
+    "amount": 100.0,
+    "payment_id": "unique_payment_123",
+    "comment": "Premium subscription",
+    "lifetime": 3600,
+    "is_test": True,
+    "merchant_id": 123456,
+    "url_success": "https://lolz.live/currison/",
+    "url_callback": "https://example.com/webhook",
+}
+
+
+def legacy_validate_params(model: type[BaseModel]):
+    # так validate_params работал раньше: модель + model_dump на каждый вызов
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            return func(*args, **model(**kwargs).model_dump())
+
+        return wrapper
+
+    return decorator
+
+
+def send(**payload) -> dict:
+    return payload
+
+
+def bench(name: str, func) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func()
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed / ITERATIONS * 1_000_000
+    print(f"{name:<28} {per_call_us:8.2f} us/invoice")
+    return per_call_us
+
+
+def main():
+    legacy = legacy_validate_params(InvoiceCreate)(send)
+    validated = validate_params(InvoiceCreate)(send)
+
+    print("validate_params:")
+    before = bench("  before", lambda: legacy(**INVOICE))
+    after = bench("  after", lambda: validated(**INVOICE))
+    print(f"  speedup: {before / after:.2f}x")
+
+    # model_construct в pydantic v2 работает на питоне и медленнее валидатора на rust,
+    # поэтому PaymentManager.create_invoice строит InvoiceCreate с валидацией
+    print("InvoiceCreate:")
+    bench("  validated", lambda: InvoiceCreate(**INVOICE).model_dump(exclude_none=True))
+    bench("  model_construct", lambda: InvoiceCreate.model_construct(**INVOICE).model_dump(exclude_none=True))
+
+
+if __name__ == "__main__":
+    main()
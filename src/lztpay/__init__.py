@@ -1,4 +1,4 @@
-from .core import Currency, LZTClient
+from .core import Currency, LZTClient, Priority
 from .exceptions import (
     APIError,
     AuthError,
@@ -17,6 +17,7 @@ __all__ = [
     "LZTClient",
     "PaymentManager",
     "Currency",
+    "Priority",
     "LZTPayError",
     "APIError",
     "AuthError",
@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from lztpay.core import LZTClient, Priority
+from lztpay.exceptions import AuthError
+from lztpay.logger import get_logger
+
+logger = get_logger()
+
+CSV_FIELDS = [
+    "id",
+    "invoice_id",
+    "payment_id",
+    "status",
+    "amount",
+    "payer_user_id",
+    "paid_date",
+    "expires_at",
+    "is_test",
+    "error",
+]
+
+
+class Checkpoint:
+    def __init__(self, path: Optional[str], every: int = 100):
+        self.path = path
+        self.every = every
+        self.done, self.offset = self._load()
+        self._since_save = 0
+
+    def _load(self) -> Tuple[int, Optional[int]]:
+        if not self.path or not os.path.exists(self.path):
+            return 0, None
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        return int(data.get("done", 0)), data.get("offset")
+
+    def advance(self, offset: Optional[int]) -> None:
+        # offset — размер файла результатов ровно после строк первых done ID
+        self.done += 1
+        self.offset = offset
+        self._since_save += 1
+        if self._since_save >= self.every:
+            self.save()
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"done": self.done, "offset": self.offset}, f)
+        os.replace(tmp_path, self.path)
+        self._since_save = 0
+
+
+class ResultWriter:
+    def __init__(self, stream: TextIO, fmt: str, write_header: bool):
+        self._stream = stream
+        self._csv: Optional[csv.DictWriter] = None
+
+        if fmt == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            if write_header:
+                self._csv.writeheader()
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self._csv:
+            self._csv.writerow(row)
+        else:
+            self._stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._stream.flush()
+
+    def position(self) -> Optional[int]:
+        return self._stream.tell() if self._stream.seekable() else None
+
+
+def read_ids(stream: TextIO, skip: int) -> Iterator[str]:
+    index = 0
+    for line in stream:
+        value = line.strip()
+        if not value:
+            continue
+        if index >= skip:
+            yield value
+        index += 1
+
+
+async def check_one(client: LZTClient, value: str, by: str) -> Dict[str, Any]:
+    row: Dict[str, Any] = {"id": value}
+    try:
+        if by == "invoice_id":
+            invoice = await client.get_invoice(invoice_id=int(value), priority=Priority.BACKGROUND)
+        else:
+            invoice = await client.get_invoice(payment_id=value, priority=Priority.BACKGROUND)
+    except AuthError:
+        raise
+    except Exception as e:
+        row["error"] = str(e) or type(e).__name__
+        return row
+
+    row.update(
+        invoice_id=invoice.invoice_id,
+        payment_id=invoice.payment_id,
+        status=invoice.status,
+        amount=invoice.amount,
+        payer_user_id=invoice.payer_user_id,
+        paid_date=invoice.paid_date,
+        expires_at=invoice.expires_at,
+        is_test=invoice.is_test,
+    )
+    return row
+
+
+async def run(
+    args: argparse.Namespace,
+    source: TextIO,
+    output: TextIO,
+    checkpoint: Checkpoint,
+    write_header: bool,
+) -> int:
+    writer = ResultWriter(output, args.format, write_header=write_header)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency * 2)
+    ready: Dict[int, Dict[str, Any]] = {}
+    errors = 0
+
+    if checkpoint.done:
+        logger.info("resuming from checkpoint", skipped=checkpoint.done)
+
+    async def worker() -> None:
+        nonlocal errors
+        while True:
+            item = await queue.get()
+            if item is None:
+                queue.task_done()
+                return
+
+            index, value = item
+            row = await check_one(client, value, args.by)
+            if "error" in row:
+                errors += 1
+
+            # строки пишутся в порядке входа: тогда файл результатов всегда содержит
+            # ровно префикс из checkpoint и продолжение не дублирует строки
+            ready[index] = row
+            while checkpoint.done in ready:
+                writer.write(ready.pop(checkpoint.done))
+                checkpoint.advance(writer.position())
+            queue.task_done()
+
+    client = LZTClient(
+        token=args.token,
+        timeout=args.timeout,
+        max_connections=args.concurrency,
+        reserved_interactive=0,
+        rate_limit=args.rate or None,
+    )
+
+    async def put(item: Optional[Tuple[int, str]]) -> None:
+        if not queue.full():
+            queue.put_nowait(item)
+            return
+
+        # воркер может упасть (например, AuthError), пока очередь заполнена —
+        # тогда ждать места в ней бессмысленно, ошибка пробрасывается сразу
+        put_task = asyncio.ensure_future(queue.put(item))
+        done, _ = await asyncio.wait([put_task, *workers], return_when=asyncio.FIRST_COMPLETED)
+        if put_task not in done:
+            put_task.cancel()
+            for task in done:
+                task.result()
+            raise RuntimeError("worker exited before input was consumed")
+
+    async with client:
+        workers = [asyncio.create_task(worker()) for _ in range(args.concurrency)]
+        try:
+            index = checkpoint.done
+            for value in read_ids(source, checkpoint.done):
+                await put((index, value))
+                index += 1
+
+            for _ in workers:
+                await put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            checkpoint.save()
+
+    logger.info("bulk check finished", processed=checkpoint.done, errors=errors)
+    return 1 if errors else 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="lztpay",
+        description="Bulk status check of LZT invoices by payment_id or invoice_id",
+    )
+    parser.add_argument("input", nargs="?", default="-", help="file with one ID per line, '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file, '-' for stdout")
+    parser.add_argument("-f", "--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--by", choices=["payment_id", "invoice_id"], default="payment_id")
+    parser.add_argument("--token", default=os.environ.get("LZT_TOKEN"), help="API token (default: $LZT_TOKEN)")
+    parser.add_argument("-c", "--concurrency", type=int, default=10)
+    parser.add_argument("-r", "--rate", type=float, default=3.0, help="max requests per second, 0 to disable")
+    parser.add_argument("--timeout", type=int, default=30)
+    parser.add_argument("--checkpoint", help="checkpoint file to resume an interrupted run")
+    parser.add_argument("--checkpoint-every", type=int, default=100)
+    parser.add_argument("-v", "--verbose", action="store_true")
+
+    args = parser.parse_args(argv)
+    if not args.token:
+        parser.error("token is required, pass --token or set LZT_TOKEN")
+    if args.concurrency < 1:
+        parser.error("concurrency must be at least 1")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    # stdout занят результатами, логи уходят в stderr
+    for handler in logger.logger.handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(sys.stderr)
+            handler.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+
+    checkpoint = Checkpoint(args.checkpoint, every=args.checkpoint_every)
+    write_header = checkpoint.done == 0
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    if args.output == "-":
+        output = sys.stdout
+    elif checkpoint.done and os.path.exists(args.output):
+        # строки, записанные после последнего сохранения checkpoint, будут получены заново
+        if checkpoint.offset is not None:
+            os.truncate(args.output, checkpoint.offset)
+        output = open(args.output, "a", encoding="utf-8", newline="")
+    else:
+        write_header = True
+        output = open(args.output, "w", encoding="utf-8", newline="")
+
+    try:
+        return asyncio.run(run(args, source, output, checkpoint, write_header))
+    except AuthError as e:
+        logger.error("authorization failed", error=e.message)
+        return 2
+    except KeyboardInterrupt:
+        logger.warn("interrupted, progress saved to checkpoint", checkpoint=args.checkpoint)
+        return 130
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 from .client import LZTClient
 from .models import Balance, Currency, Invoice
+from .priority import Priority
 
-__all__ = ["LZTClient", "Balance", "Currency", "Invoice"]
+__all__ = ["LZTClient", "Balance", "Currency", "Invoice", "Priority"]
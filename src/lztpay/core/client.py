@@ -6,6 +6,7 @@ from lztpay.decorators import measure_time, retry_on_error
 from lztpay.exceptions import AuthError, NetworkError
 from lztpay.logger import get_logger
 from lztpay.core.models import Balance, Invoice, InvoiceCreate, InvoiceResponse
+from lztpay.core.priority import AdmissionGate, Priority
 
 logger = get_logger()
 
@@ -13,9 +14,23 @@ logger = get_logger()
 class LZTClient:
     BASE_URL = "https://prod-api.lzt.market"
 
-    def __init__(self, token: str, timeout: int = 300):
+    def __init__(
+        self,
+        token: str,
+        timeout: int = 300,
+        # как у httpx по умолчанию: без явного лимита клиент не теряет прежнюю емкость
+        max_connections: int = 100,
+        reserved_interactive: int = 2,
+        rate_limit: Optional[float] = None,
+    ):
         self.token = token.strip()
         self.timeout = timeout
+        self.max_connections = max_connections
+        self._gate = AdmissionGate(
+            max_concurrency=max_connections,
+            reserved_interactive=reserved_interactive,
+            rate_limit=rate_limit,
+        )
         self._client: Optional[httpx.AsyncClient] = None
 
     async def __aenter__(self) -> "LZTClient":
@@ -29,6 +44,7 @@ class LZTClient:
                 "Content-Type": "application/json",
             },
             timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_connections),
         )
         return self
 
@@ -44,17 +60,19 @@ class LZTClient:
         endpoint: str,
         params: Optional[Dict[str, Any]] = None,
         json: Optional[Dict[str, Any]] = None,
+        priority: Priority = Priority.NORMAL,
     ) -> Dict[str, Any]:
         if not self._client:
             raise RuntimeError("client not initialized, use async with")
 
         try:
-            response = await self._client.request(
-                method,
-                endpoint,
-                params=params,
-                json=json,
-            )
+            async with self._gate.slot(priority):
+                response = await self._client.request(
+                    method,
+                    endpoint,
+                    params=params,
+                    json=json,
+                )
 
             if response.status_code == 401:
                 raise AuthError("invalid or expired token")
@@ -65,15 +83,22 @@ class LZTClient:
             logger.error("network request failed", error=str(e), endpoint=endpoint)
             raise NetworkError(f"network error: {str(e)}")
 
-    async def get_balance(self) -> Balance:
-        data = await self._request("GET", "/balance/exchange")
+    def get_stats(self) -> Dict[str, Any]:
+        return self._gate.get_stats()
+
+    async def get_balance(self, priority: Priority = Priority.NORMAL) -> Balance:
+        data = await self._request("GET", "/balance/exchange", priority=priority)
         balance_data = data.get("to", {}).get("balance", {})
         return Balance(
             amount=float(balance_data.get("balance", "0").replace(",", "")),
             currency="rub"
         )
 
-    async def create_invoice(self, invoice_data: InvoiceCreate) -> Invoice:
+    async def create_invoice(
+        self,
+        invoice_data: InvoiceCreate,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Invoice:
         payload = invoice_data.model_dump(exclude_none=True)
 
         logger.info(
@@ -83,7 +108,7 @@ class LZTClient:
             merchant_id=invoice_data.merchant_id,
         )
 
-        data = await self._request("POST", "/invoice", json=payload)
+        data = await self._request("POST", "/invoice", json=payload, priority=priority)
         response = InvoiceResponse(**data)
         return response.invoice
 
@@ -91,6 +116,7 @@ class LZTClient:
         self,
         invoice_id: Optional[int] = None,
         payment_id: Optional[str] = None,
+        priority: Priority = Priority.NORMAL,
     ) -> Invoice:
         if not invoice_id and not payment_id:
             raise ValueError("either invoice_id or payment_id must be provided")
@@ -101,6 +127,6 @@ class LZTClient:
         if payment_id:
             params["payment_id"] = payment_id
 
-        data = await self._request("GET", "/invoice", params=params)
+        data = await self._request("GET", "/invoice", params=params, priority=priority)
         response = InvoiceResponse(**data)
         return response.invoice
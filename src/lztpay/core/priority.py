@@ -0,0 +1,129 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+class AdmissionGate:
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        reserved_interactive: int = 2,
+        rate_limit: Optional[float] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        # хотя бы один слот всегда остается для неинтерактивных запросов
+        self.reserved_interactive = min(max(reserved_interactive, 0), max_concurrency - 1)
+        self._interval = 1.0 / rate_limit if rate_limit else 0.0
+        self._next_token = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future, float]] = []
+        self._seq = itertools.count()
+        self._lanes: Dict[Priority, Dict[str, Any]] = {
+            priority: {"queued": 0, "max_queued": 0, "admitted": 0, "wait_total": 0.0, "wait_max": 0.0}
+            for priority in Priority
+        }
+
+    def _limit(self, priority: int) -> int:
+        # неинтерактивные запросы не могут занять зарезервированные слоты
+        if priority == Priority.INTERACTIVE:
+            return self.max_concurrency
+        return self.max_concurrency - self.reserved_interactive
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.NORMAL) -> AsyncIterator[None]:
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: Priority = Priority.NORMAL) -> None:
+        loop = asyncio.get_running_loop()
+        lane = self._lanes[priority]
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future, loop.time()))
+        lane["queued"] += 1
+        lane["max_queued"] = max(lane["max_queued"], lane["queued"])
+        self._admit()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                lane["queued"] -= 1
+            raise
+
+    def release(self) -> None:
+        self._active -= 1
+        self._admit()
+
+    def _admit(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while self._waiters:
+            priority, _, future, enqueued_at = self._waiters[0]
+            if future.cancelled():
+                heapq.heappop(self._waiters)
+                continue
+
+            # в голове кучи самый приоритетный запрос: если он не проходит,
+            # менее приоритетные тоже не пройдут
+            if self._active >= self._limit(priority):
+                return
+
+            now = loop.time()
+            if self._interval and now < self._next_token:
+                if self._timer is None:
+                    self._timer = loop.call_at(self._next_token, self._on_timer)
+                return
+
+            heapq.heappop(self._waiters)
+            self._active += 1
+            if self._interval:
+                self._next_token = max(now, self._next_token) + self._interval
+
+            waited = now - enqueued_at
+            lane = self._lanes[Priority(priority)]
+            lane["queued"] -= 1
+            lane["admitted"] += 1
+            lane["wait_total"] += waited
+            lane["wait_max"] = max(lane["wait_max"], waited)
+            future.set_result(None)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._admit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lanes = {}
+        for priority, lane in self._lanes.items():
+            admitted = lane["admitted"]
+            lanes[priority.name.lower()] = {
+                "queued": lane["queued"],
+                "max_queued": lane["max_queued"],
+                "admitted": admitted,
+                "avg_wait_ms": round(lane["wait_total"] / admitted * 1000, 2) if admitted else 0.0,
+                "max_wait_ms": round(lane["wait_max"] * 1000, 2),
+            }
+
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "reserved_interactive": self.reserved_interactive,
+            "lanes": lanes,
+        }
@@ -1,3 +1,4 @@
+import asyncio
 from functools import wraps
 from typing import Any, Callable, Dict
 
@@ -11,12 +12,11 @@ logger = get_logger()
 
 def validate_params(model: type[BaseModel]) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
-        @wraps(func)
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
+        validator = model.__pydantic_validator__
+
+        def prepare(kwargs: Dict[str, Any]) -> Dict[str, Any]:
             try:
-                validated = model(**kwargs)
-                new_kwargs = validated.model_dump()
-                return func(*args, **new_kwargs)
+                validated = validator.validate_python(kwargs)
             except PydanticValidationError as e:
                 errors = e.errors()
                 logger.error(
@@ -28,7 +28,18 @@ def validate_params(model: type[BaseModel]) -> Callable[[Callable[..., Any]], Ca
                     f"Invalid parameters for {func.__name__}",
                     details={"errors": errors},
                 )
+            return validated.model_dump()
+
+        @wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await func(*args, **prepare(kwargs))
+
+        @wraps(func)
+        def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+            return func(*args, **prepare(kwargs))
 
-        return wrapper
+        if asyncio.iscoroutinefunction(func):
+            return async_wrapper
+        return sync_wrapper
 
     return decorator
@@ -0,0 +1,3 @@
+from .dispatcher import ConfirmationDispatcher
+
+__all__ = ["ConfirmationDispatcher"]
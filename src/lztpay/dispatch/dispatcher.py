@@ -0,0 +1,251 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from lztpay.logger import get_logger
+from lztpay.storage import ConfirmedSet
+
+logger = get_logger()
+
+Handler = Callable[[Dict[str, Any]], Union[Awaitable[None], None]]
+
+
+def _is_async(handler: Handler) -> bool:
+    # объект с async def __call__ тоже асинхронный обработчик
+    return asyncio.iscoroutinefunction(handler) or asyncio.iscoroutinefunction(
+        getattr(type(handler), "__call__", None)
+    )
+
+
+async def _invoke(handler: Handler, event: Dict[str, Any]) -> None:
+    if _is_async(handler):
+        await handler(event)
+        return
+
+    # partial или обертка над корутиной возвращают awaitable — его ждем в цикле событий,
+    # иначе корутина не выполнится, а событие посчитается доставленным
+    result = await asyncio.to_thread(handler, event)
+    if inspect.isawaitable(result):
+        await result
+
+
+class ConfirmationDispatcher:
+    def __init__(
+        self,
+        workers: int = 4,
+        queue_size: int = 1000,
+        handler_timeout: float = 30.0,
+        max_attempts: int = 3,
+        retry_delay: float = 1.0,
+        confirmed: Optional[ConfirmedSet] = None,
+    ):
+        self.workers = workers
+        self.handler_timeout = handler_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._handlers: List[Tuple[Handler, float]] = []
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self.confirmed = confirmed if confirmed is not None else ConfirmedSet()
+        self.dead_letters: Dict[str, Dict[str, Any]] = {}
+        self._succeeded: Dict[str, Set[int]] = {}
+        self._stats = {
+            "published": 0,
+            "delivered": 0,
+            "duplicates": 0,
+            "failed": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "max_queue_depth": 0,
+            "blocked_publishes": 0,
+        }
+        self._dequeued = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def add_handler(self, handler: Handler, timeout: Optional[float] = None) -> None:
+        self._handlers.append((handler, timeout or self.handler_timeout))
+        logger.info("confirmation handler registered", handler=getattr(handler, "__name__", repr(handler)))
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info("confirmation dispatcher started", workers=self.workers)
+
+    async def stop(self, drain: bool = True) -> None:
+        if not self._tasks:
+            return
+        if drain:
+            await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # недоставленные события не теряются: они уходят в dead_letters
+        pending = 0
+        while not self._queue.empty():
+            event, _ = self._queue.get_nowait()
+            self._queue.task_done()
+            self._fail(event)
+            pending += 1
+
+        logger.info("confirmation dispatcher stopped", pending=pending)
+
+    async def redeliver_failed(self) -> int:
+        # платежи уже в confirmed, поэтому события ставятся в очередь в обход дедупликации
+        events = list(self.dead_letters.values())
+        self.dead_letters.clear()
+        if not self._handlers:
+            return 0
+
+        self.start()
+        for event in events:
+            await self._enqueue(event)
+        return len(events)
+
+    async def publish(self, event: Dict[str, Any]) -> bool:
+        # True — подтверждение новое и принято; False — платеж уже был подтвержден
+        payment_id = event["payment_id"]
+        if not self.confirmed.add(payment_id):
+            self._stats["duplicates"] += 1
+            logger.debug("duplicate confirmation skipped", payment_id=payment_id)
+            return False
+
+        if self._handlers:
+            self.start()
+            await self._enqueue(event)
+        return True
+
+    async def _enqueue(self, event: Dict[str, Any]) -> None:
+        if self._queue.full():
+            self._stats["blocked_publishes"] += 1
+        await self._queue.put((event, time.monotonic()))
+
+        self._stats["published"] += 1
+        depth = self._queue.qsize()
+        if depth > self._stats["max_queue_depth"]:
+            self._stats["max_queue_depth"] = depth
+
+    async def _worker(self) -> None:
+        while True:
+            event, enqueued_at = await self._queue.get()
+            waited = time.monotonic() - enqueued_at
+            self._dequeued += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+            try:
+                await self._deliver(event)
+            except asyncio.CancelledError:
+                # остановка без drain прерывает доставку, событие уходит в dead_letters
+                self._fail(event)
+                raise
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, event: Dict[str, Any]) -> None:
+        payment_id = event["payment_id"]
+        succeeded = self._succeeded.setdefault(payment_id, set())
+
+        for index, (handler, timeout) in enumerate(self._handlers):
+            # при повторной доставке уже отработавшие обработчики не вызываются
+            if index in succeeded:
+                continue
+            if await self._call_with_retry(handler, timeout, event):
+                succeeded.add(index)
+
+        if len(succeeded) < len(self._handlers):
+            self._fail(event)
+            return
+
+        del self._succeeded[payment_id]
+        self.dead_letters.pop(payment_id, None)
+        self._stats["delivered"] += 1
+
+    def _fail(self, event: Dict[str, Any]) -> None:
+        # платеж остается подтвержденным, состояние доставки живет только в dead_letters
+        self._stats["failed"] += 1
+        self.dead_letters[event["payment_id"]] = event
+        logger.error("confirmation not delivered", payment_id=event["payment_id"])
+
+    async def _call(self, handler: Handler, timeout: float, event: Dict[str, Any]) -> None:
+        call = asyncio.ensure_future(_invoke(handler, event))
+
+        # asyncio.wait вместо wait_for: в 3.10/3.11 wait_for может проглотить отмену
+        # воркера, если обработчик завершился в тот же момент
+        try:
+            done, _ = await asyncio.wait({call}, timeout=timeout)
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+
+        if not done:
+            call.cancel()
+            raise asyncio.TimeoutError
+        call.result()
+
+    async def _call_with_retry(self, handler: Handler, timeout: float, event: Dict[str, Any]) -> bool:
+        name = getattr(handler, "__name__", repr(handler))
+        current_delay = self.retry_delay
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self._call(handler, timeout, event)
+                return True
+            except asyncio.TimeoutError:
+                self._stats["timeouts"] += 1
+                error = f"timed out after {timeout}s"
+                if not _is_async(handler):
+                    # поток синхронного обработчика нельзя прервать, повтор запустил бы
+                    # вторую копию параллельно с первой
+                    logger.error(
+                        "sync confirmation handler timed out, not retried",
+                        handler=name,
+                        payment_id=event["payment_id"],
+                        timeout=timeout,
+                    )
+                    return False
+            except Exception as e:
+                error = str(e)
+
+            if attempt == self.max_attempts:
+                logger.error(
+                    "confirmation handler failed",
+                    handler=name,
+                    payment_id=event["payment_id"],
+                    attempts=attempt,
+                    error=error,
+                )
+                return False
+
+            self._stats["retries"] += 1
+            logger.warn(
+                "retrying confirmation handler",
+                handler=name,
+                payment_id=event["payment_id"],
+                attempt=attempt,
+                delay=current_delay,
+                error=error,
+            )
+            await asyncio.sleep(current_delay)
+            current_delay *= 2
+
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "queue_depth": self._queue.qsize(),
+            "workers": len(self._tasks),
+            "handlers": len(self._handlers),
+            "dead_letters": len(self.dead_letters),
+            "avg_wait_ms": round(self._wait_total / self._dequeued * 1000, 2) if self._dequeued else 0.0,
+            "max_wait_ms": round(self._wait_max * 1000, 2),
+        }
@@ -0,0 +1,3 @@
+from .loop_lag import LoopLagMonitor
+
+__all__ = ["LoopLagMonitor"]
@@ -0,0 +1,145 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+from lztpay.logger import get_logger
+
+logger = get_logger()
+
+
+def _operation(frame: Optional[FrameType]) -> str:
+    # ближайший к вершине стека кадр из lztpay — это и есть активная операция
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("lztpay.") and not module.startswith("lztpay.monitor"):
+            return f"{module[len('lztpay.'):]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "external"
+
+
+class LoopLagMonitor:
+    def __init__(
+        self,
+        threshold: float = 0.1,
+        interval: float = 0.1,
+        stack_limit: int = 20,
+    ):
+        self.threshold = threshold
+        self.interval = interval
+        self.stack_limit = stack_limit
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id = 0
+        self._last_tick = 0.0
+        self._captured_tick = -1.0
+        self._sample: Optional[Dict[str, Any]] = None
+        self._stats: Dict[str, Any] = {
+            "stalls": 0,
+            "max_lag_ms": 0.0,
+            "last_stall": None,
+            "by_operation": {},
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task:
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._sampler, name="lztpay-loop-monitor", daemon=True)
+        self._thread.start()
+        logger.info("loop monitor started", threshold_ms=round(self.threshold * 1000, 2))
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self._thread:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+        logger.info("loop monitor stopped")
+
+    async def _heartbeat(self) -> None:
+        while True:
+            tick = self._last_tick
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_tick = now
+
+            lag = now - expected
+            if lag >= self.threshold:
+                self._report(lag, tick)
+
+    def _sampler(self) -> None:
+        # поток просыпается несколько раз за порог и почти ничего не делает, пока цикл жив
+        poll = self.threshold / 2
+        while not self._stop.wait(poll):
+            tick = self._last_tick
+            blocked = time.monotonic() - tick - self.interval
+            if blocked < self.threshold or tick == self._captured_tick:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+
+            self._captured_tick = tick
+            self._sample = {
+                "tick": tick,
+                "operation": _operation(frame),
+                "stack": traceback.format_list(traceback.extract_stack(frame, self.stack_limit)),
+            }
+            del frame
+
+    def _report(self, lag: float, tick: float) -> None:
+        sample = self._sample
+        if sample is not None and sample["tick"] != tick:
+            sample = None
+        self._sample = None
+
+        lag_ms = round(lag * 1000, 2)
+        operation = sample["operation"] if sample else "unknown"
+        stack: List[str] = sample["stack"] if sample else []
+
+        self._stats["stalls"] += 1
+        self._stats["max_lag_ms"] = max(self._stats["max_lag_ms"], lag_ms)
+        self._stats["by_operation"][operation] = self._stats["by_operation"].get(operation, 0) + 1
+        self._stats["last_stall"] = {
+            "lag_ms": lag_ms,
+            "operation": operation,
+            "at": time.time(),
+        }
+
+        logger.warn(
+            "event loop stall",
+            lag_ms=lag_ms,
+            operation=operation,
+            stack="".join(stack) or None,
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "by_operation": dict(self._stats["by_operation"]),
+            "threshold_ms": round(self.threshold * 1000, 2),
+        }
@@ -1,11 +1,14 @@
 import asyncio
-from typing import Optional, Union
+import os
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
-from lztpay.core import LZTClient
-from lztpay.core.models import Currency, InvoiceCreate
-from lztpay.exceptions import PaymentNotFoundError
+from lztpay.core import LZTClient, Priority
+from lztpay.core.models import Currency, Invoice, InvoiceCreate
+from lztpay.dispatch import ConfirmationDispatcher
+from lztpay.exceptions import AuthError, PaymentNotFoundError
 from lztpay.logger import get_logger
-from lztpay.storage import MemoryStore
+from lztpay.monitor import LoopLagMonitor
+from lztpay.storage import ConfirmedSet, MemoryStore
 
 logger = get_logger()
 
@@ -18,15 +21,50 @@ class PaymentManager:
         url_success: str,
         url_callback: Optional[str] = None,
         ttl_seconds: int = 3600,
+        dispatch_workers: int = 4,
+        dispatch_queue_size: int = 1000,
+        handler_timeout: float = 30.0,
+        confirmed_retention: int = 86400,
+        snapshot_path: Optional[str] = None,
     ):
         self.client = client
         self.merchant_id = merchant_id
         self.url_success = url_success
         self.url_callback = url_callback
         self.store = MemoryStore(ttl_seconds=ttl_seconds)
+        self.confirmed = ConfirmedSet(retention_seconds=confirmed_retention)
+        self.dispatcher = ConfirmationDispatcher(
+            workers=dispatch_workers,
+            queue_size=dispatch_queue_size,
+            handler_timeout=handler_timeout,
+            confirmed=self.confirmed,
+        )
+        self.snapshot_path = snapshot_path
         self._cleanup_task: Optional[asyncio.Task] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self.loop_monitor: Optional[LoopLagMonitor] = None
+
+    def add_handler(
+        self,
+        handler: Callable[[dict], Union[Awaitable[None], None]],
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.dispatcher.add_handler(handler, timeout=timeout)
+
+    async def stop_dispatch(self, drain: bool = True) -> None:
+        await self.dispatcher.stop(drain=drain)
+
+    async def redeliver_failed(self) -> int:
+        return await self.dispatcher.redeliver_failed()
+
+    async def start_cleanup(
+        self,
+        interval: int = 300,
+        stall_threshold: Optional[float] = None,
+    ) -> None:
+        # повторный вызов перезапускает очистку: иначе старая задача и поток монитора остались бы висеть
+        await self.stop_cleanup()
 
-    async def start_cleanup(self, interval: int = 300) -> None:
         async def cleanup_loop():
             while True:
                 await asyncio.sleep(interval)
@@ -35,6 +73,10 @@ class PaymentManager:
         self._cleanup_task = asyncio.create_task(cleanup_loop())
         logger.info("cleanup task started", interval=interval)
 
+        if stall_threshold is not None:
+            self.loop_monitor = LoopLagMonitor(threshold=stall_threshold)
+            self.loop_monitor.start()
+
     async def stop_cleanup(self) -> None:
         if self._cleanup_task:
             self._cleanup_task.cancel()
@@ -42,8 +84,46 @@ class PaymentManager:
                 await self._cleanup_task
             except asyncio.CancelledError:
                 pass
+            self._cleanup_task = None
             logger.info("cleanup task stopped")
 
+        if self.loop_monitor:
+            await self.loop_monitor.stop()
+            self.loop_monitor = None
+
+    async def restore_snapshot(self) -> int:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return 0
+        return await self.store.restore(self.snapshot_path)
+
+    async def start_snapshots(self, interval: int = 60) -> None:
+        if not self.snapshot_path:
+            raise ValueError("snapshot_path is not configured")
+
+        async def snapshot_loop():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self.store.snapshot(self.snapshot_path)
+                except Exception as e:
+                    logger.error("store snapshot failed", path=self.snapshot_path, error=str(e))
+
+        self._snapshot_task = asyncio.create_task(snapshot_loop())
+        logger.info("snapshot task started", interval=interval, path=self.snapshot_path)
+
+    async def stop_snapshots(self) -> None:
+        if self._snapshot_task:
+            self._snapshot_task.cancel()
+            try:
+                await self._snapshot_task
+            except asyncio.CancelledError:
+                pass
+            self._snapshot_task = None
+            logger.info("snapshot task stopped")
+
+        if self.snapshot_path:
+            await self.store.snapshot(self.snapshot_path)
+
     async def create_invoice(
         self,
         payment_id: str,
@@ -54,6 +134,65 @@ class PaymentManager:
         is_test: bool = False,
         additional_data: Optional[str] = None,
     ) -> dict:
+        (payment_id, amount, user_id, extra), result = await self._create_invoice(
+            payment_id,
+            amount,
+            comment=comment,
+            lifetime=lifetime,
+            currency=currency,
+            is_test=is_test,
+            additional_data=additional_data,
+        )
+        await self.store.put(payment_id, amount, user_id, **extra)
+        return result
+
+    async def create_invoices(
+        self,
+        invoices: Iterable[Dict[str, Any]],
+        concurrency: int = 10,
+    ) -> List[Optional[dict]]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def create(params: Dict[str, Any]) -> Tuple[tuple, dict]:
+            async with semaphore:
+                return await self._create_invoice(**params)
+
+        created = await asyncio.gather(
+            *(create(params) for params in invoices),
+            return_exceptions=True,
+        )
+
+        entries = []
+        results: List[Optional[dict]] = []
+
+        for item in created:
+            # с неверным токеном не пройдет ни один инвойс, это ошибка вызова, а не пакета
+            if isinstance(item, AuthError):
+                raise item
+            if isinstance(item, Exception):
+                logger.error("invoice creation failed", error=str(item))
+                results.append(None)
+                continue
+
+            entry, result = item
+            entries.append(entry)
+            results.append(result)
+
+        if entries:
+            await self.store.put_many(entries)
+
+        return results
+
+    async def _create_invoice(
+        self,
+        payment_id: str,
+        amount: float,
+        comment: str = "",
+        lifetime: int = 3600,
+        currency: Union[Currency, str] = Currency.RUB,
+        is_test: bool = False,
+        additional_data: Optional[str] = None,
+    ) -> Tuple[Tuple[str, float, int, Dict[str, Any]], dict]:
 
         invoice_data = InvoiceCreate(
             currency=currency,
@@ -70,15 +209,6 @@ class PaymentManager:
 
         invoice = await self.client.create_invoice(invoice_data)
 
-        await self.store.put(
-            payment_id,
-            amount,
-            0,
-            invoice_id=invoice.invoice_id,
-            is_test=is_test,
-            additional_data=additional_data,
-        )
-
         logger.info(
             "invoice created",
             payment_id=payment_id,
@@ -88,7 +218,17 @@ class PaymentManager:
             url=invoice.url,
         )
 
-        return {
+        entry = (
+            payment_id,
+            amount,
+            0,
+            {
+                "invoice_id": invoice.invoice_id,
+                "is_test": is_test,
+                "additional_data": additional_data,
+            },
+        )
+        result = {
             "payment_id": payment_id,
             "invoice_id": invoice.invoice_id,
             "amount": amount,
@@ -97,8 +237,13 @@ class PaymentManager:
             "expires_at": invoice.expires_at,
             "is_test": is_test,
         }
+        return entry, result
 
-    async def check_payment(self, payment_id: str) -> Optional[dict]:
+    async def check_payment(
+        self,
+        payment_id: str,
+        priority: Priority = Priority.NORMAL,
+    ) -> Optional[dict]:
         stored = await self.store.get(payment_id)
 
         if not stored:
@@ -107,25 +252,19 @@ class PaymentManager:
                 details={"payment_id": payment_id},
             )
 
-        invoice = await self.client.get_invoice(payment_id=payment_id)
+        invoice = await self.client.get_invoice(payment_id=payment_id, priority=priority)
 
         if invoice.status == "paid":
             await self.store.delete(payment_id)
-            logger.info(
-                "payment confirmed",
-                payment_id=payment_id,
-                invoice_id=invoice.invoice_id,
-                amount=invoice.amount,
-                payer_user_id=invoice.payer_user_id,
-            )
-            return {
-                "payment_id": payment_id,
-                "invoice_id": invoice.invoice_id,
-                "amount": invoice.amount,
-                "payer_user_id": invoice.payer_user_id,
-                "paid_date": invoice.paid_date,
-                "confirmed": True,
-            }
+            result = self._confirm(payment_id, invoice)
+            # подтверждение возвращается ровно один раз: параллельная проверка того же
+            # платежа ведет себя так же, как проверка уже удаленной записи
+            if not await self.dispatcher.publish(result):
+                raise PaymentNotFoundError(
+                    f"payment already confirmed: {payment_id}",
+                    details={"payment_id": payment_id},
+                )
+            return result
 
         logger.debug(
             "payment not confirmed yet",
@@ -135,8 +274,99 @@ class PaymentManager:
 
         return None
 
+    async def check_payments(
+        self,
+        payment_ids: Iterable[str],
+        concurrency: int = 10,
+        priority: Priority = Priority.BACKGROUND,
+    ) -> Dict[str, Union[dict, None, Exception]]:
+        # для каждого id: словарь — оплачен, None — еще не оплачен,
+        # исключение — не найден (PaymentNotFoundError) или проверка не удалась
+        payment_ids = list(payment_ids)
+        stored = await self.store.get_many(payment_ids)
+        results: Dict[str, Union[dict, None, Exception]] = {}
+        pending = []
+
+        for payment_id, data in zip(payment_ids, stored):
+            if data:
+                pending.append(payment_id)
+            else:
+                results[payment_id] = PaymentNotFoundError(
+                    f"payment not found or expired: {payment_id}",
+                    details={"payment_id": payment_id},
+                )
+
+        if results:
+            logger.warn("payments not found or expired", count=len(results))
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(payment_id: str) -> Invoice:
+            async with semaphore:
+                return await self.client.get_invoice(payment_id=payment_id, priority=priority)
+
+        invoices = await asyncio.gather(
+            *(fetch(pid) for pid in pending),
+            return_exceptions=True,
+        )
+
+        paid = []
+
+        for payment_id, invoice in zip(pending, invoices):
+            if isinstance(invoice, AuthError):
+                raise invoice
+            if isinstance(invoice, Exception):
+                logger.error("payment check failed", payment_id=payment_id, error=str(invoice))
+                results[payment_id] = invoice
+                continue
+
+            if invoice.status == "paid":
+                paid.append(payment_id)
+                results[payment_id] = self._confirm(payment_id, invoice)
+            else:
+                results[payment_id] = None
+
+        if paid:
+            await self.store.delete_many(paid)
+            for payment_id in paid:
+                if not await self.dispatcher.publish(results[payment_id]):
+                    results[payment_id] = PaymentNotFoundError(
+                        f"payment already confirmed: {payment_id}",
+                        details={"payment_id": payment_id},
+                    )
+
+        return results
+
+    def _confirm(self, payment_id: str, invoice: Invoice) -> dict:
+        logger.info(
+            "payment confirmed",
+            payment_id=payment_id,
+            invoice_id=invoice.invoice_id,
+            amount=invoice.amount,
+            payer_user_id=invoice.payer_user_id,
+        )
+        return {
+            "payment_id": payment_id,
+            "invoice_id": invoice.invoice_id,
+            "amount": invoice.amount,
+            "payer_user_id": invoice.payer_user_id,
+            "paid_date": invoice.paid_date,
+            "confirmed": True,
+        }
+
+    def is_confirmed(self, payment_id: str) -> bool:
+        return self.confirmed.is_confirmed(payment_id)
+
     async def get_payment_info(self, payment_id: str) -> Optional[dict]:
         return await self.store.get(payment_id)
 
     def get_stats(self) -> dict:
-        return self.store.get_stats()
+        stats = {
+            **self.store.get_stats(),
+            **self.confirmed.get_stats(),
+            "client": self.client.get_stats(),
+            "dispatch": self.dispatcher.get_stats(),
+        }
+        if self.loop_monitor:
+            stats["loop"] = self.loop_monitor.get_stats()
+        return stats
@@ -1,3 +1,4 @@
+from .confirmed import ConfirmedSet
 from .memory import MemoryStore
 
-__all__ = ["MemoryStore"]
+__all__ = ["MemoryStore", "ConfirmedSet"]
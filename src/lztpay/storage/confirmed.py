@@ -0,0 +1,133 @@
+import hashlib
+import time
+from array import array
+from collections import deque
+from typing import Any, Deque, Dict
+
+_EMPTY = 0
+_MAX_KEY = 0xFFFF
+
+
+def _fingerprint(key: bytes) -> int:
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    # 0 зарезервирован под пустой слот
+    return int.from_bytes(digest, "little") | 1
+
+
+def _encode(payment_id: str) -> bytes:
+    key = payment_id.encode()
+    if len(key) > _MAX_KEY:
+        raise ValueError(f"payment_id is too long: {len(key)} bytes")
+    return key
+
+
+class _HashBucket:
+    # открытая адресация по 64-битным отпечаткам: отпечаток быстро отсекает промахи, а сам id
+    # лежит в общем буфере корзины и сверяется при совпадении, поэтому коллизия не дает ложного ответа
+    def __init__(self, started_at: float, capacity: int = 1024):
+        self.started_at = started_at
+        self.size = 0
+        self._fps = array("Q", bytes(8 * capacity))
+        # смещение id в буфере << 16 | длина
+        self._refs = array("Q", bytes(8 * capacity))
+        self._keys = bytearray()
+        self._mask = capacity - 1
+
+    def _key_at(self, i: int) -> bytearray:
+        ref = self._refs[i]
+        start = ref >> 16
+        return self._keys[start:start + (ref & _MAX_KEY)]
+
+    def _find(self, fp: int, key: bytes) -> int:
+        fps = self._fps
+        mask = self._mask
+        i = fp & mask
+
+        while True:
+            value = fps[i]
+            if value == _EMPTY or (value == fp and self._key_at(i) == key):
+                return i
+            i = (i + 1) & mask
+
+    def contains(self, fp: int, key: bytes) -> bool:
+        return self._fps[self._find(fp, key)] != _EMPTY
+
+    def add(self, fp: int, key: bytes) -> bool:
+        i = self._find(fp, key)
+        if self._fps[i] != _EMPTY:
+            return False
+
+        self._fps[i] = fp
+        self._refs[i] = len(self._keys) << 16 | len(key)
+        self._keys += key
+        self.size += 1
+        if self.size * 10 > len(self._fps) * 7:
+            self._resize()
+        return True
+
+    def _resize(self) -> None:
+        old_fps = self._fps
+        old_refs = self._refs
+        capacity = len(old_fps) * 2
+
+        self._fps = fps = array("Q", bytes(8 * capacity))
+        self._refs = refs = array("Q", bytes(8 * capacity))
+        self._mask = mask = capacity - 1
+        # id уникальны внутри корзины, поэтому при переносе их не нужно сравнивать
+        for fp, ref in zip(old_fps, old_refs):
+            if fp == _EMPTY:
+                continue
+            i = fp & mask
+            while fps[i] != _EMPTY:
+                i = (i + 1) & mask
+            fps[i] = fp
+            refs[i] = ref
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._fps.itemsize * len(self._fps) * 2 + len(self._keys)
+
+
+class ConfirmedSet:
+    def __init__(self, retention_seconds: int = 86400, buckets: int = 24):
+        self._retention = retention_seconds
+        self._span = retention_seconds / buckets
+        self._buckets: Deque[_HashBucket] = deque([_HashBucket(time.monotonic())])
+
+    def _rotate(self) -> None:
+        now = time.monotonic()
+        if now - self._buckets[-1].started_at < self._span:
+            return
+
+        self._buckets.append(_HashBucket(now))
+        # корзина удаляется, когда даже самая свежая запись в ней старше окна хранения
+        while now - self._buckets[0].started_at >= self._retention + self._span:
+            self._buckets.popleft()
+
+    def add(self, payment_id: str) -> bool:
+        self._rotate()
+        key = _encode(payment_id)
+        fp = _fingerprint(key)
+        for bucket in self._buckets:
+            if bucket.contains(fp, key):
+                return False
+        return self._buckets[-1].add(fp, key)
+
+    def is_confirmed(self, payment_id: str) -> bool:
+        self._rotate()
+        key = _encode(payment_id)
+        fp = _fingerprint(key)
+        return any(bucket.contains(fp, key) for bucket in self._buckets)
+
+    __contains__ = is_confirmed
+
+    def __len__(self) -> int:
+        return sum(bucket.size for bucket in self._buckets)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "confirmed_tracked": len(self),
+            "confirmed_buckets": len(self._buckets),
+            "confirmed_memory_bytes": sum(bucket.memory_bytes for bucket in self._buckets),
+            "confirmed_retention_seconds": self._retention,
+        }
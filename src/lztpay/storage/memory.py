@@ -1,8 +1,9 @@
 import asyncio
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from lztpay.logger import get_logger
+from lztpay.storage.snapshot import read_snapshot, write_snapshot
 
 logger = get_logger()
 
@@ -12,6 +13,8 @@ class MemoryStore:
         self._data: Dict[str, Dict[str, Any]] = {}
         self._ttl = ttl_seconds
         self._lock = asyncio.Lock()
+        self._snapshot_lock = asyncio.Lock()
+        self._snapshot_write: Optional[asyncio.Future] = None
 
     async def put(self, payment_id: str, amount: float, user_id: int, **extra: Any) -> None:
         async with self._lock:
@@ -55,6 +58,56 @@ class MemoryStore:
                 return True
             return False
 
+    async def put_many(self, entries: Iterable[Tuple[str, float, int, Dict[str, Any]]]) -> None:
+        async with self._lock:
+            now = datetime.utcnow()
+            expires_at = now + timedelta(seconds=self._ttl)
+            count = 0
+
+            for payment_id, amount, user_id, extra in entries:
+                self._data[payment_id] = {
+                    "payment_id": payment_id,
+                    "amount": amount,
+                    "user_id": user_id,
+                    "created_at": now,
+                    "expires_at": expires_at,
+                    **extra,
+                }
+                count += 1
+
+            logger.debug("payments stored", count=count)
+
+    async def get_many(self, payment_ids: Iterable[str]) -> List[Optional[Dict[str, Any]]]:
+        async with self._lock:
+            now = datetime.utcnow()
+            results: List[Optional[Dict[str, Any]]] = []
+            expired = 0
+
+            for key in payment_ids:
+                data = self._data.get(key)
+
+                if data and now > data["expires_at"]:
+                    del self._data[key]
+                    expired += 1
+                    data = None
+
+                results.append(data)
+
+            if expired:
+                logger.debug("payments expired", count=expired)
+
+            return results
+
+    async def delete_many(self, payment_ids: Iterable[str]) -> List[bool]:
+        async with self._lock:
+            results = [self._data.pop(key, None) is not None for key in payment_ids]
+            deleted = sum(results)
+
+            if deleted:
+                logger.debug("payments deleted", count=deleted)
+
+            return results
+
     async def find_by_user(self, user_id: int) -> list[Dict[str, Any]]:
         async with self._lock:
             now = datetime.utcnow()
@@ -85,6 +138,37 @@ class MemoryStore:
 
             return len(expired_keys)
 
+    async def snapshot(self, path: str) -> int:
+        async with self._snapshot_lock:
+            # отмененный ранее snapshot() не останавливает поток записи; новый снимок
+            # ждет его, иначе старые данные могли бы перезаписать свежий файл
+            if self._snapshot_write and not self._snapshot_write.done():
+                await asyncio.wait({self._snapshot_write})
+
+            # под блокировкой записи копируются, сериализация и запись — в потоке;
+            # сами словари отдаются наружу через get() и могут меняться во время записи
+            async with self._lock:
+                entries = [dict(entry) for entry in self._data.values()]
+
+            self._snapshot_write = asyncio.ensure_future(asyncio.to_thread(write_snapshot, path, entries))
+            count = await asyncio.shield(self._snapshot_write)
+        logger.info("store snapshot written", path=path, count=count)
+        return count
+
+    async def restore(self, path: str) -> int:
+        # индекс из снимка собирается в потоке, в цикле событий остается только слияние
+        loaded = await asyncio.to_thread(read_snapshot, path, datetime.utcnow())
+
+        async with self._lock:
+            # записи, созданные после старта, новее снимка
+            current = len(self._data)
+            loaded.update(self._data)
+            self._data = loaded
+            restored = len(loaded) - current
+
+        logger.info("store snapshot restored", path=path, count=restored)
+        return restored
+
     def get_stats(self) -> Dict[str, Any]:
         return {
             "total_payments": len(self._data),
@@ -0,0 +1,163 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from datetime import datetime
+from itertools import compress
+from operator import eq
+from typing import Any, Dict, Iterable, List
+
+MAGIC = b"LZTS"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")
+SECTION = struct.Struct("<Q")
+
+CORE_FIELDS = ("payment_id", "amount", "user_id", "created_at", "expires_at")
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_ts(value: datetime) -> float:
+    return (value - _EPOCH).total_seconds()
+
+
+# в снимок попадают только простые значения: файл читается через json и не может
+# выполнить код при загрузке, в отличие от pickle
+_SAFE_TYPES = frozenset({type(None), bool, int, float, str})
+
+
+def _check_values(key: str, values: Iterable[Any]) -> None:
+    unsupported = set(map(type, values)) - _SAFE_TYPES
+    if unsupported:
+        names = ", ".join(sorted(t.__name__ for t in unsupported))
+        raise TypeError(f"extra field {key!r} cannot be stored in a snapshot: {names}")
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def write_snapshot(path: str, entries: List[Dict[str, Any]]) -> int:
+    # колоночный формат: числовые поля — сырые массивы, строки и extra — одним блоком,
+    # чтобы при загрузке не разбирать каждую запись через struct
+    payment_ids = []
+    amounts = array("d")
+    user_ids = array("q")
+    created = array("d")
+    expires = array("d")
+    extras = []
+
+    for entry in entries:
+        payment_ids.append(entry["payment_id"])
+        amounts.append(entry["amount"])
+        user_ids.append(entry["user_id"])
+        created.append(_to_ts(entry["created_at"]))
+        expires.append(_to_ts(entry["expires_at"]))
+        extras.append({k: v for k, v in entry.items() if k not in CORE_FIELDS})
+
+    # у записей из PaymentManager одинаковый набор extra-полей: тогда они пишутся
+    # колонками, и при загрузке записи собираются без разбора словаря на каждую
+    keys = tuple(extras[0]) if extras else ()
+    if all(tuple(extra) == keys for extra in extras):
+        columns = [[extra[k] for extra in extras] for k in keys]
+        for key, column in zip(keys, columns):
+            _check_values(key, column)
+        extras = ["columns", keys, columns]
+    else:
+        for extra in extras:
+            for key, value in extra.items():
+                _check_values(key, (value,))
+        extras = ["rows", extras]
+
+    sections = [
+        amounts.tobytes(),
+        user_ids.tobytes(),
+        created.tobytes(),
+        expires.tobytes(),
+        _dumps(payment_ids),
+        _dumps(extras),
+    ]
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(payment_ids)))
+            for section in sections:
+                f.write(SECTION.pack(len(section)))
+                f.write(section)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return len(payment_ids)
+
+
+def read_snapshot(path: str, now: datetime) -> Dict[str, Dict[str, Any]]:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, version, count = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"unsupported snapshot format: {path}")
+
+        offset = HEADER.size
+        sections = []
+        for _ in range(6):
+            (size,) = SECTION.unpack_from(mm, offset)
+            offset += SECTION.size
+            sections.append(mm[offset:offset + size])
+            offset += size
+
+    amounts = array("d", sections[0])
+    user_ids = array("q", sections[1])
+    created = array("d", sections[2])
+    expires = array("d", sections[3])
+    payment_ids = json.loads(sections[4])
+    extras = json.loads(sections[5])
+
+    if not len(amounts) == len(user_ids) == len(created) == len(expires) == len(payment_ids) == count:
+        raise ValueError(f"corrupted snapshot: {path}")
+    if extras[0] not in ("columns", "rows"):
+        raise ValueError(f"corrupted snapshot: {path}")
+
+    # строки собираются итераторами на уровне C: это в разы быстрее цикла по записям
+    keep = list(map(_to_ts(now).__le__, expires))
+    select = (lambda column: column) if all(keep) else (lambda column: compress(column, keep))
+    columns = [
+        select(payment_ids),
+        select(amounts),
+        select(user_ids),
+        _datetimes(select(created)),
+        _datetimes(select(expires)),
+    ]
+
+    layout = extras[0]
+    if layout == "columns":
+        keys = CORE_FIELDS + tuple(extras[1])
+        columns.extend(map(select, extras[2]))
+    else:
+        keys = CORE_FIELDS
+
+    # первая колонка — payment_id, по нему сразу строится индекс хранилища
+    entries = {row[0]: dict(zip(keys, row)) for row in zip(*columns)}
+    if layout == "rows":
+        for entry, extra in zip(entries.values(), select(extras[1])):
+            if extra:
+                entry.update(extra)
+    return entries
+
+
+def _datetimes(timestamps: Iterable[float]) -> List[datetime]:
+    timestamps = list(timestamps)
+    from_ts = datetime.utcfromtimestamp
+
+    # записи из put_many идут подряд с одним временем создания — тогда объекты datetime
+    # переиспользуются; для уникальных времен кэш только мешает
+    if sum(map(eq, timestamps, timestamps[1:])) * 2 < len(timestamps):
+        return list(map(from_ts, timestamps))
+
+    cache = {ts: from_ts(ts) for ts in set(timestamps)}
+    return list(map(cache.__getitem__, timestamps))
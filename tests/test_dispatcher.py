@@ -0,0 +1,54 @@
+import asyncio
+import functools
+
+from lztpay.dispatch import ConfirmationDispatcher
+
+
+class AsyncCallableHandler:
+    def __init__(self):
+        self.events = []
+
+    async def __call__(self, event: dict) -> None:
+        await asyncio.sleep(0)
+        self.events.append(event["payment_id"])
+
+
+async def _deliver(handler) -> ConfirmationDispatcher:
+    dispatcher = ConfirmationDispatcher(workers=1, max_attempts=1, retry_delay=0)
+    dispatcher.add_handler(handler)
+    assert await dispatcher.publish({"payment_id": "p1"})
+    await dispatcher.stop()
+    return dispatcher
+
+
+def test_callable_object_handler_is_awaited():
+    handler = AsyncCallableHandler()
+    dispatcher = asyncio.run(_deliver(handler))
+
+    assert handler.events == ["p1"]
+    assert dispatcher.get_stats()["delivered"] == 1
+    assert not dispatcher.dead_letters
+
+
+def test_sync_wrapper_returning_coroutine_is_awaited():
+    events = []
+
+    async def handler(event: dict, tag: str) -> None:
+        events.append((event["payment_id"], tag))
+
+    dispatcher = asyncio.run(_deliver(functools.partial(handler, tag="x")))
+
+    assert events == [("p1", "x")]
+    assert dispatcher.get_stats()["delivered"] == 1
+
+
+def test_failed_callable_object_goes_to_dead_letters():
+    class Failing:
+        async def __call__(self, event: dict) -> None:
+            raise RuntimeError("boom")
+
+    dispatcher = asyncio.run(_deliver(Failing()))
+
+    assert dispatcher.get_stats()["delivered"] == 0
+    assert list(dispatcher.dead_letters) == ["p1"]
+    assert dispatcher.confirmed.is_confirmed("p1")
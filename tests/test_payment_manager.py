@@ -0,0 +1,131 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from lztpay import PaymentManager
+from lztpay.exceptions import AuthError, NetworkError, PaymentNotFoundError
+
+
+class FakeClient:
+    def __init__(self, status: str = "paid"):
+        self.status = status
+
+    async def get_invoice(self, payment_id: str, priority=None):
+        await asyncio.sleep(0)
+        return SimpleNamespace(
+            status=self.status,
+            invoice_id=1,
+            amount=100.0,
+            payer_user_id=7,
+            paid_date=0,
+        )
+
+    def get_stats(self) -> dict:
+        return {}
+
+
+def _manager(status: str = "paid") -> PaymentManager:
+    return PaymentManager(FakeClient(status), merchant_id=1, url_success="https://example.com")
+
+
+def test_confirmation_is_returned_once_even_if_delivery_fails():
+    async def run():
+        manager = _manager()
+        manager.dispatcher.max_attempts = 1
+
+        async def failing(event: dict) -> None:
+            raise RuntimeError("boom")
+
+        manager.add_handler(failing)
+        await manager.store.put("p1", 100.0, 0)
+
+        first = await manager.check_payment("p1")
+        await manager.stop_dispatch()
+        with pytest.raises(PaymentNotFoundError):
+            await manager.check_payment("p1")
+        return manager, first
+
+    manager, first = asyncio.run(run())
+
+    assert first["confirmed"] is True
+    assert manager.is_confirmed("p1")
+    assert list(manager.dispatcher.dead_letters) == ["p1"]
+
+
+def test_concurrent_checks_confirm_once():
+    async def run():
+        manager = _manager()
+        await manager.store.put("p1", 100.0, 0)
+        return await asyncio.gather(
+            manager.check_payment("p1"),
+            manager.check_payment("p1"),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+
+    assert sum(isinstance(r, dict) for r in results) == 1
+    assert sum(isinstance(r, PaymentNotFoundError) for r in results) == 1
+
+
+class PartlyFailingClient(FakeClient):
+    def __init__(self, error: Exception):
+        super().__init__(status="not_paid")
+        self.error = error
+
+    async def get_invoice(self, payment_id: str, priority=None):
+        if payment_id == "broken":
+            raise self.error
+        return await super().get_invoice(payment_id, priority)
+
+    async def create_invoice(self, data):
+        raise self.error
+
+
+def test_check_payments_marks_every_id():
+    async def run():
+        manager = PaymentManager(
+            PartlyFailingClient(NetworkError("timeout")),
+            merchant_id=1,
+            url_success="https://example.com",
+        )
+        await manager.store.put_many([("ok", 1.0, 0, {}), ("broken", 1.0, 0, {})])
+        return await manager.check_payments(["ok", "broken", "missing"])
+
+    results = asyncio.run(run())
+
+    assert results["ok"] is None
+    assert isinstance(results["broken"], NetworkError)
+    assert isinstance(results["missing"], PaymentNotFoundError)
+
+
+def test_auth_error_is_raised_from_batches():
+    manager = PaymentManager(
+        PartlyFailingClient(AuthError("invalid token")),
+        merchant_id=1,
+        url_success="https://example.com",
+    )
+
+    async def run():
+        await manager.store.put("broken", 1.0, 0)
+        with pytest.raises(AuthError):
+            await manager.check_payments(["broken"])
+        with pytest.raises(AuthError):
+            await manager.create_invoices([{"payment_id": "a1", "amount": 1.0}])
+
+    asyncio.run(run())
+
+
+def test_loop_stats_disappear_after_monitor_stops():
+    async def run():
+        manager = _manager()
+        await manager.start_cleanup(interval=60, stall_threshold=0.05)
+        with_monitor = "loop" in manager.get_stats()
+        await manager.stop_cleanup()
+        await manager.start_cleanup(interval=60)
+        without_monitor = "loop" in manager.get_stats()
+        await manager.stop_cleanup()
+        return with_monitor, without_monitor
+
+    assert asyncio.run(run()) == (True, False)